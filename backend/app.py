@@ -1,31 +1,122 @@
 """
 Verba Backend - FastAPI server for audio transcription, summarization, and session management
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from pydantic import BaseModel
 import uvicorn
+import aiofiles
 import tempfile
 import os
 import sys
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import anyio.to_thread
 from pathlib import Path
 from datetime import datetime
+from typing import List
 import logging
 
 # Import our modules
-from transcriber import transcribe_audio
-from summarizer import summarize_transcript
+from transcriber import transcribe_audio, get_model
+from summarizer import summarize_transcript, summarize_transcripts
 from storage import storage
-from chunk_storage import ChunkStorage
+from chunk_storage import ChunkStorage, UploadTooLargeError, write_upload
 import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Verba API", version="0.2.0", description="Offline-first meeting assistant")
+app = FastAPI(
+    title="Verba API",
+    version="0.2.0",
+    description="Offline-first meeting assistant",
+    default_response_class=ORJSONResponse
+)
+
+# Audio file extensions accepted by /api/transcribe
+ALLOWED_AUDIO_EXTENSIONS = frozenset({'.webm', '.wav', '.mp3', '.m4a'})
+
+
+def detect_container(head: bytes):
+    """
+    Identify an audio container from the first bytes of a file
+    Returns the matching extension from ALLOWED_AUDIO_EXTENSIONS, or None
+    """
+    if head.startswith(b'\x1a\x45\xdf\xa3'):
+        return '.webm'  # EBML header (WebM / Matroska)
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return '.wav'
+    if head[4:8] == b'ftyp':
+        return '.m4a'  # ISO base media (MP4 / M4A)
+    if head.startswith(b'ID3') or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return '.mp3'  # ID3 tag or MPEG audio frame sync
+    return None
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject requests whose declared Content-Length exceeds the limit
+    Runs before the body is read, so oversized uploads never reach disk
+    """
+    
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_bytes:
+                        response = ORJSONResponse(
+                            status_code=413,
+                            content={"error": "Upload too large", "detail": f"Limit is {self.max_bytes} bytes"}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        
+        await self.app(scope, receive, send)
+
+
+# Transcription is CPU-bound and synchronous, so it runs in a bounded pool
+# instead of blocking the event loop
+TRANSCRIBE_POOL = ThreadPoolExecutor(
+    max_workers=settings.MAX_CONCURRENT_TRANSCRIBE,
+    thread_name_prefix="transcribe"
+)
+
+
+async def run_transcription(audio_path: str) -> str:
+    """Transcribe an audio file in the transcription thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        TRANSCRIBE_POOL,
+        functools.partial(transcribe_audio, audio_path, preprocess=settings.ENABLE_AUDIO_PREPROCESSING)
+    )
+
+
+# Session storage is synchronous SQLite; calls run in worker threads, at most
+# this many at a time
+STORAGE_CONCURRENCY = 8
+_storage_limiter = None
+
+
+async def run_storage(fn, *args, **kwargs):
+    """Run a blocking storage call in a worker thread without blocking the event loop"""
+    global _storage_limiter
+    # Created lazily: the limiter must be built inside the running event loop
+    if _storage_limiter is None:
+        _storage_limiter = anyio.CapacityLimiter(STORAGE_CONCURRENCY)
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=_storage_limiter)
+
 
 # Detect if running as PyInstaller bundle
 def is_bundled():
@@ -53,6 +144,9 @@ origins.extend(settings.ALLOWED_ORIGINS)
 # Remove duplicates
 origins = list(set(origins))
 
+# Added before CORS so CORS wraps it and browsers can read the 413
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.MAX_UPLOAD_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -62,15 +156,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files if running as bundled app (Windows installer, etc.)
-if is_bundled():
-    static_dir = get_base_path() / "frontend" / "dist"
-    if static_dir.exists():
-        logger.info(f"Running as bundled app, serving static files from: {static_dir}")
-        # Mount static assets
-        app.mount("/assets", StaticFiles(directory=str(static_dir / "assets")), name="assets")
-    else:
-        logger.warning(f"Static directory not found: {static_dir}")
+# Compress transcripts, session lists and Markdown exports (text compresses well)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 
 # Request/Response models
@@ -94,6 +181,15 @@ class ErrorResponse(BaseModel):
     detail: str = ""
 
 
+@app.on_event("startup")
+async def preload_model():
+    """
+    Start loading the Whisper model in the background at startup
+    The server accepts requests meanwhile; the first transcription waits for it
+    """
+    TRANSCRIBE_POOL.submit(get_model)
+
+
 # Root endpoints
 @app.get("/")
 def root():
@@ -113,6 +209,7 @@ def status():
         "online_features_enabled": settings.ONLINE_FEATURES_ENABLED,
         "model": settings.WHISPER_MODEL_SIZE,
         "device": settings.WHISPER_DEVICE,
+        "compute_type": settings.WHISPER_COMPUTE_TYPE,
         "audio_preprocessing": settings.ENABLE_AUDIO_PREPROCESSING
     }
 
@@ -127,32 +224,49 @@ async def transcribe_endpoint(audio: UploadFile = File(...)):
     tmp_path = None
     try:
         # Validate file type
-        if not audio.filename.endswith(('.webm', '.wav', '.mp3', '.m4a')):
-            return JSONResponse(
+        suffix = os.path.splitext(audio.filename or '')[1].lower()
+        if suffix not in ALLOWED_AUDIO_EXTENSIONS:
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "Invalid file format. Supported: webm, wav, mp3, m4a"}
             )
         
-        # Save uploaded file to temp location
-        suffix = os.path.splitext(audio.filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await audio.read()
-            tmp.write(content)
+        # Check the content really is audio before copying it anywhere.
+        # The recorder always names uploads .webm (Safari records MP4), so a
+        # known container under another extension is accepted as what it is.
+        container = detect_container(await audio.read(16))
+        await audio.seek(0)
+        if container is None:
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": "Invalid file format. Supported: webm, wav, mp3, m4a"}
+            )
+        
+        # Stream uploaded file to temp location
+        with tempfile.NamedTemporaryFile(delete=False, suffix=container) as tmp:
             tmp_path = tmp.name
         
-        logger.info(f"Transcribing audio file: {audio.filename} ({len(content)} bytes)")
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            size = await write_upload(audio, f, settings.MAX_UPLOAD_BYTES)
+        
+        logger.info(f"Transcribing audio file: {audio.filename} ({size} bytes)")
         
         # Transcribe
-        transcript = transcribe_audio(tmp_path, preprocess=settings.ENABLE_AUDIO_PREPROCESSING)
+        transcript = await run_transcription(tmp_path)
         
         return {
             "transcript": transcript,
             "status": "success"
         }
     
+    except UploadTooLargeError as e:
+        return ORJSONResponse(
+            status_code=413,
+            content={"error": "Upload too large", "detail": str(e)}
+        )
     except Exception as e:
         logger.error(f"Transcription error: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Transcription failed. Please try recording again.",
@@ -178,7 +292,7 @@ async def summarize(request: SummarizeRequest):
     """
     try:
         if not request.transcript or len(request.transcript.strip()) == 0:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "No transcript provided"}
             )
@@ -192,7 +306,7 @@ async def summarize(request: SummarizeRequest):
         session_id = None
         if request.save_session:
             try:
-                session_id = storage.create_session(request.transcript, summary, request.title)
+                session_id = await run_storage(storage.create_session, request.transcript, summary, request.title)
                 logger.info(f"Session saved: {session_id}")
             except Exception as e:
                 logger.error(f"Failed to save session: {e}")
@@ -206,11 +320,11 @@ async def summarize(request: SummarizeRequest):
         if session_id:
             response["session_id"] = session_id
         
-        return JSONResponse(response)
+        return ORJSONResponse(response)
     
     except Exception as e:
         logger.error(f"Summarization error: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to generate summary. Please try again.",
@@ -219,6 +333,57 @@ async def summarize(request: SummarizeRequest):
         )
 
 
+class BatchSummarizeItem(BaseModel):
+    """A single transcript in a batch summarization request"""
+    id: str
+    transcript: str
+
+
+class BatchSummarizeRequest(BaseModel):
+    """Request body for batch summarization endpoint"""
+    items: List[BatchSummarizeItem]
+
+
+@app.post("/api/summarize/batch")
+async def summarize_batch(request: BatchSummarizeRequest):
+    """
+    Summarize several transcripts in one request
+    Summaries are returned in request order, keyed by the caller's id
+    Nothing is saved as a session
+    """
+    try:
+        if len(request.items) > settings.MAX_BATCH_SUMMARIZE:
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": f"Too many transcripts. Maximum per batch: {settings.MAX_BATCH_SUMMARIZE}"}
+            )
+        
+        logger.info(f"Summarizing batch of {len(request.items)} transcripts")
+        
+        # CPU-bound: run in a worker thread so other requests keep being served
+        summaries = await anyio.to_thread.run_sync(
+            summarize_transcripts, [item.transcript for item in request.items]
+        )
+        
+        return {
+            "results": [
+                {"id": item.id, "summary": summary}
+                for item, summary in zip(request.items, summaries)
+            ],
+            "status": "success"
+        }
+    
+    except Exception as e:
+        logger.error(f"Batch summarization error: {e}")
+        return ORJSONResponse(
+            status_code=500,
+            content={
+                "error": "Failed to generate summaries. Please try again.",
+                "detail": str(e)
+            }
+        )
+
+
 class UpdateSessionRequest(BaseModel):
     """Request body for updating a session"""
     title: str = None
@@ -234,12 +399,12 @@ async def create_session(request: SaveSessionRequest):
     """
     try:
         if not request.transcript or len(request.transcript.strip()) == 0:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "No transcript provided"}
             )
             
-        session_id = storage.create_session(request.transcript, request.summary, request.title)
+        session_id = await run_storage(storage.create_session, request.transcript, request.summary, request.title)
         logger.info(f"Session saved manually: {session_id}")
         
         return {
@@ -248,7 +413,7 @@ async def create_session(request: SaveSessionRequest):
         }
     except Exception as e:
         logger.error(f"Failed to save session: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to save session",
@@ -263,15 +428,16 @@ async def update_session(session_id: str, request: UpdateSessionRequest):
     Update an existing session
     """
     try:
-        success = storage.update_session(
-            session_id, 
+        success = await run_storage(
+            storage.update_session,
+            session_id,
             title=request.title,
             transcript=request.transcript,
             summary=request.summary
         )
         
         if not success:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": "Session not found"}
             )
@@ -279,7 +445,7 @@ async def update_session(session_id: str, request: UpdateSessionRequest):
         return {"status": "success"}
     except Exception as e:
         logger.error(f"Failed to update session {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to update session",
@@ -289,23 +455,26 @@ async def update_session(session_id: str, request: UpdateSessionRequest):
 
 
 @app.delete("/api/sessions/{session_id}")
-def delete_session(session_id: str):
+async def delete_session(session_id: str):
     """
     Delete a session by ID
     """
     try:
-        success = storage.delete_session(session_id)
+        success = await run_storage(storage.delete_session, session_id)
         
         if not success:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": "Session not found"}
             )
             
-        return {"status": "success"}
+        return {
+            "message": "Session deleted successfully",
+            "status": "success"
+        }
     except Exception as e:
         logger.error(f"Failed to delete session {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to delete session",
@@ -336,7 +505,7 @@ async def initialize_recording(request: InitializeRecordingRequest):
         }
     except Exception as e:
         logger.error(f"Failed to initialize recording: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to initialize recording session",
@@ -353,24 +522,26 @@ async def upload_chunk(session_id: str, chunk_index: int, chunk: UploadFile = Fi
     try:
         chunk_store = ChunkStorage(session_id)
         
-        # Read chunk data
-        chunk_data = await chunk.read()
+        # Stream chunk to disk
+        result = await chunk_store.save_chunk_stream(chunk_index, chunk, settings.MAX_UPLOAD_BYTES)
         
-        if len(chunk_data) == 0:
-            return JSONResponse(
+        if result is None:
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "Empty chunk data"}
             )
         
-        # Save chunk
-        result = chunk_store.save_chunk(chunk_index, chunk_data)
-        
         return {
             "status": "success",
             **result
         }
+    except UploadTooLargeError as e:
+        return ORJSONResponse(
+            status_code=413,
+            content={"error": "Chunk too large", "detail": str(e)}
+        )
     except ValueError as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "error": "Session not found",
@@ -379,7 +550,7 @@ async def upload_chunk(session_id: str, chunk_index: int, chunk: UploadFile = Fi
         )
     except Exception as e:
         logger.error(f"Failed to upload chunk {chunk_index} for session {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to save chunk",
@@ -396,19 +567,31 @@ async def finalize_recording(session_id: str):
     tmp_path = None
     try:
         chunk_store = ChunkStorage(session_id)
-        
-        # Create temporary file for combined audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-            tmp_path = tmp.name
-        
-        # Combine all chunks
-        result = chunk_store.combine_chunks(Path(tmp_path))
+        offsets = chunk_store.get_chunk_offsets()
+        
+        if offsets:
+            # Chunks already sit back to back in the stream file, so it is
+            # transcribed in place instead of being copied to a temp file.
+            # Only recorded chunks are transcribed, never a rejected tail
+            chunk_store.trim_stream(offsets[-1])
+            audio_path = str(chunk_store.get_stream_path())
+            result = {
+                "chunks_combined": len(offsets),
+                "total_size": offsets[-1]
+            }
+        else:
+            # Legacy per-chunk sessions are combined into a temporary file
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
+                tmp_path = tmp.name
+            
+            result = chunk_store.combine_chunks(Path(tmp_path))
+            audio_path = tmp_path
         
         logger.info(f"Finalized recording {session_id}: {result['chunks_combined']} chunks, {result['total_size']} bytes")
         
         # Transcribe the combined audio
         logger.info(f"Transcribing finalized recording: {session_id}")
-        transcript = transcribe_audio(tmp_path, preprocess=settings.ENABLE_AUDIO_PREPROCESSING)
+        transcript = await run_transcription(audio_path)
         
         # Clean up chunk storage
         chunk_store.cleanup()
@@ -421,7 +604,7 @@ async def finalize_recording(session_id: str):
         }
     
     except ValueError as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "error": "Session not found or no chunks available",
@@ -430,7 +613,7 @@ async def finalize_recording(session_id: str):
         )
     except Exception as e:
         logger.error(f"Failed to finalize recording {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to finalize recording",
@@ -464,7 +647,7 @@ async def recording_status(session_id: str):
             "status": "success"
         }
     except ValueError as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "error": "Session not found",
@@ -473,7 +656,7 @@ async def recording_status(session_id: str):
         )
     except Exception as e:
         logger.error(f"Failed to get status for session {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to get session status",
@@ -483,22 +666,35 @@ async def recording_status(session_id: str):
 
 
 # Session management endpoints
+def cached_response(request: Request, etag: str, content: dict):
+    """
+    Return content with its ETag, or 304 if the client already has it
+    no-cache makes browsers revalidate instead of reusing a stale copy
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return ORJSONResponse(content=content, headers=headers)
+
+
 @app.get("/api/sessions")
-def list_sessions():
+async def list_sessions(request: Request):
     """
     Get list of all saved sessions (with preview)
     Returns most recent first
     """
     try:
-        sessions = storage.list_sessions()
-        return {
+        etag, sessions = await run_storage(storage.list_sessions_with_etag)
+        return cached_response(request, etag, {
             "sessions": sessions,
             "count": len(sessions),
             "status": "success"
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to list sessions: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to load session history",
@@ -508,27 +704,28 @@ def list_sessions():
 
 
 @app.get("/api/sessions/{session_id}")
-def get_session(session_id: str):
+async def get_session(session_id: str, request: Request):
     """
     Get full session data by ID
     Includes complete transcript and summary
     """
     try:
-        session = storage.get_session(session_id)
+        entry = await run_storage(storage.get_session_with_etag, session_id)
         
-        if not session:
-            return JSONResponse(
+        if not entry:
+            return ORJSONResponse(
                 status_code=404,
                 content={"error": "Session not found"}
             )
         
-        return {
+        etag, session = entry
+        return cached_response(request, etag, {
             "session": session,
             "status": "success"
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to get session {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to load session",
@@ -537,25 +734,15 @@ def get_session(session_id: str):
         )
 
 
-@app.get("/api/sessions/{session_id}/export")
-def export_session(session_id: str):
+async def session_markdown(session: dict):
     """
-    Export session as Markdown file
-    Returns formatted markdown string
+    Yield a session formatted as Markdown, piece by piece
+    Avoids building the whole document (and its transcript) as one string
     """
-    try:
-        session = storage.get_session(session_id)
-        
-        if not session:
-            return JSONResponse(
-                status_code=404,
-                content={"error": "Session not found"}
-            )
-        
-        # Format as Markdown
-        created_date = datetime.fromisoformat(session['created_at']).strftime("%B %d, %Y at %I:%M %p")
-        
-        markdown = f"""# Meeting Summary
+    created_date = datetime.fromisoformat(session['created_at']).strftime("%B %d, %Y at %I:%M %p")
+    summary = session['summary']
+    
+    yield f"""# Meeting Summary
 
 **Date:** {created_date}
 
@@ -563,7 +750,9 @@ def export_session(session_id: str):
 
 ## Transcript
 
-{session['transcript']}
+"""
+    yield session['transcript']
+    yield """
 
 ---
 
@@ -572,24 +761,40 @@ def export_session(session_id: str):
 ### 📌 Key Points
 
 """
+    
+    for i, point in enumerate(summary.get('key_points', []), 1):
+        yield f"{i}. {point}\n"
+    
+    if summary.get('decisions'):
+        yield "\n### ✅ Decisions Made\n\n"
+        for i, decision in enumerate(summary['decisions'], 1):
+            yield f"{i}. {decision}\n"
+    
+    if summary.get('action_items'):
+        yield "\n### 🎯 Action Items\n\n"
+        for i, item in enumerate(summary['action_items'], 1):
+            yield f"{i}. {item}\n"
+    
+    yield "\n---\n\n*Generated by Verba - Offline-first meeting assistant*\n"
+
+
+@app.get("/api/sessions/{session_id}/export")
+async def export_session(session_id: str):
+    """
+    Export session as Markdown file
+    Streams formatted markdown
+    """
+    try:
+        session = await run_storage(storage.get_session, session_id)
         
-        for i, point in enumerate(session['summary']['key_points'], 1):
-            markdown += f"{i}. {point}\n"
-        
-        if session['summary']['decisions']:
-            markdown += "\n### ✅ Decisions Made\n\n"
-            for i, decision in enumerate(session['summary']['decisions'], 1):
-                markdown += f"{i}. {decision}\n"
-        
-        if session['summary']['action_items']:
-            markdown += "\n### 🎯 Action Items\n\n"
-            for i, item in enumerate(session['summary']['action_items'], 1):
-                markdown += f"{i}. {item}\n"
-        
-        markdown += "\n---\n\n*Generated by Verba - Offline-first meeting assistant*\n"
+        if not session:
+            return ORJSONResponse(
+                status_code=404,
+                content={"error": "Session not found"}
+            )
         
-        return PlainTextResponse(
-            content=markdown,
+        return StreamingResponse(
+            session_markdown(session),
             media_type="text/markdown",
             headers={
                 "Content-Disposition": f"attachment; filename=verba-session-{session_id[:8]}.md"
@@ -598,7 +803,7 @@ def export_session(session_id: str):
     
     except Exception as e:
         logger.error(f"Failed to export session {session_id}: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Failed to export session",
@@ -607,65 +812,41 @@ def export_session(session_id: str):
         )
 
 
-@app.delete("/api/sessions/{session_id}")
-def delete_session(session_id: str):
+class SPAStaticFiles(StaticFiles):
     """
-    Delete a session by ID
+    Static files for the React frontend
+    Unknown paths fall back to index.html so client-side routing works
     """
-    try:
-        deleted = storage.delete_session(session_id)
-        
-        if not deleted:
-            return JSONResponse(
-                status_code=404,
-                content={"error": "Session not found"}
-            )
-        
-        return {
-            "message": "Session deleted successfully",
-            "status": "success"
-        }
-    except Exception as e:
-        logger.error(f"Failed to delete session {session_id}: {e}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Failed to delete session",
-                "detail": str(e)
-            }
-        )
+    
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as e:
+            if e.status_code != 404:
+                raise
+            return await super().get_response("index.html", scope)
 
 
-# Serve frontend for bundled app (catch-all for React routing)
+# Serve frontend for bundled app (Windows installer, etc.)
+# Mounted last so every API route above is matched first
 if is_bundled():
-    @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
-        """
-        Serve the React frontend for any non-API routes
-        This enables client-side routing in the bundled app
-        """
-        static_dir = get_base_path() / "frontend" / "dist"
-        
-        # If requesting a specific file that exists, serve it
-        file_path = static_dir / full_path
-        if file_path.is_file():
-            return FileResponse(file_path)
-        
-        # Otherwise, serve index.html for React routing
-        index_path = static_dir / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
-        
-        # Fallback error
-        return JSONResponse(
-            status_code=404,
-            content={"error": "Frontend not found"}
-        )
+    static_dir = get_base_path() / "frontend" / "dist"
+    if static_dir.exists():
+        logger.info(f"Running as bundled app, serving static files from: {static_dir}")
+        app.mount("/", SPAStaticFiles(directory=str(static_dir), html=True), name="frontend")
+    else:
+        logger.warning(f"Static directory not found: {static_dir}")
 
 
 if __name__ == "__main__":
     logger.info("Starting Verba API server...")
     logger.info(f"Online features: {'enabled' if settings.ONLINE_FEATURES_ENABLED else 'disabled'}")
-    logger.info(f"Whisper model: {settings.WHISPER_MODEL_SIZE} on {settings.WHISPER_DEVICE}")
+    logger.info(f"Whisper model: {settings.WHISPER_MODEL_SIZE} on {settings.WHISPER_DEVICE} ({settings.WHISPER_COMPUTE_TYPE})")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # uvicorn[standard] ships uvloop (not on Windows) and httptools, and the
+    # default "auto" loop/http settings pick them up when available
+    if is_bundled() or settings.WORKERS <= 1:
+        uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    else:
+        # Multiple workers need an import string so each process loads the app
+        uvicorn.run("app:app", host="0.0.0.0", port=8000, log_level="info", workers=settings.WORKERS)
@@ -15,11 +15,40 @@ ONLINE_FEATURES_ENABLED = os.getenv("ONLINE_FEATURES_ENABLED", "false").lower()
 # large = best accuracy (~10GB RAM)
 WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
 WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
-WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+# Quantization used by CTranslate2
+# int8 = int8 weights and activations, fastest on CPU (uses VNNI where available)
+# int8_float16 = int8 weights, float16 activations - RECOMMENDED on CUDA
+# int8_bfloat16, float16, float32 are also accepted
+WHISPER_COMPUTE_TYPE = os.getenv(
+    "WHISPER_COMPUTE_TYPE",
+    "int8_float16" if WHISPER_DEVICE == "cuda" else "int8"
+)
+
+# Number of transcriptions allowed to run at the same time
+MAX_CONCURRENT_TRANSCRIBE = int(os.getenv("MAX_CONCURRENT_TRANSCRIBE", "2"))
+
+# CPU threads per transcription; by default the cores are split between
+# concurrent transcriptions so they don't oversubscribe the CPU
+WHISPER_CPU_THREADS = int(os.getenv(
+    "WHISPER_CPU_THREADS",
+    max(1, (os.cpu_count() or 1) // MAX_CONCURRENT_TRANSCRIBE)
+))
+
+# Uvicorn worker processes (ignored in the bundled app, which runs one)
+# Keep at 1 unless uploads for a recording session always reach the same
+# worker: chunk metadata is cached per process. Above 1 the session read
+# cache is turned off, so every session request goes to the database
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# Most transcripts accepted by one /api/summarize/batch request
+MAX_BATCH_SUMMARIZE = int(os.getenv("MAX_BATCH_SUMMARIZE", "50"))
 
 # Database
 DATABASE_PATH = os.getenv("DATABASE_PATH", "verba_sessions.db")
 
+# Largest request body accepted (uploads and chunks), in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+
 # Audio processing
 ENABLE_AUDIO_PREPROCESSING = os.getenv("ENABLE_AUDIO_PREPROCESSING", "false").lower() == "true"
 
@@ -2,15 +2,22 @@
 Storage layer for Verba - handles session persistence using SQLite
 """
 import json
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from sqlalchemy import create_engine, Column, String, Text, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import uuid
+import settings
 
 Base = declarative_base()
 
+# Number of full sessions kept in the in-memory read cache
+SESSION_CACHE_SIZE = 128
+
 
 class Session(Base):
     """
@@ -54,11 +61,39 @@ class StorageManager:
     Manages all database operations for sessions
     """
     
-    def __init__(self, db_path: str = "verba_sessions.db"):
-        """Initialize database connection"""
+    def __init__(self, db_path: str = "verba_sessions.db", cache_reads: bool = True):
+        """
+        Initialize database connection
+        cache_reads=False always reads from the database; needed when several
+        processes share it, since each one only sees its own writes
+        """
         self.engine = create_engine(f"sqlite:///{db_path}")
         Base.metadata.create_all(self.engine)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        
+        # Read caches, invalidated by every write below.
+        self._cache_reads = cache_reads
+        # session_id -> (etag, session), least recently used first
+        self._session_cache: "OrderedDict[str, Tuple[str, Dict]]" = OrderedDict()
+        # limit -> (etag, session previews)
+        self._list_cache: Dict[int, Tuple[str, List[Dict]]] = {}
+        # Bumped on every write so a read that raced with it isn't cached
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _etag(data) -> str:
+        """Strong ETag for a JSON-serializable value"""
+        digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        return f'"{digest}"'
+    
+    def _invalidate(self, session_id: str = None) -> None:
+        """Drop cached reads affected by a write"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._list_cache.clear()
+            if session_id is not None:
+                self._session_cache.pop(session_id, None)
     
     def create_session(self, transcript: str, summary: Dict, title: str = None) -> str:
         """
@@ -77,6 +112,7 @@ class StorageManager:
             )
             db_session.add(new_session)
             db_session.commit()
+            self._invalidate()
             return session_id
         finally:
             db_session.close()
@@ -86,6 +122,19 @@ class StorageManager:
         Get list of all sessions (with preview only)
         Returns most recent first
         """
+        return self.list_sessions_with_etag(limit)[1]
+    
+    def list_sessions_with_etag(self, limit: int = 50) -> Tuple[str, List[Dict]]:
+        """
+        Get list of all sessions (with preview only) and its ETag
+        Served from cache until the next write
+        """
+        with self._cache_lock:
+            cached = self._list_cache.get(limit) if self._cache_reads else None
+            generation = self._cache_generation
+        if cached is not None:
+            return cached
+        
         db_session = self.SessionLocal()
         
         try:
@@ -93,15 +142,36 @@ class StorageManager:
                 Session.created_at.desc()
             ).limit(limit).all()
             
-            return [s.to_dict(include_full=False) for s in sessions]
+            previews = [s.to_dict(include_full=False) for s in sessions]
         finally:
             db_session.close()
+        
+        entry = (self._etag(previews), previews)
+        with self._cache_lock:
+            if self._cache_reads and generation == self._cache_generation:
+                self._list_cache[limit] = entry
+        return entry
     
     def get_session(self, session_id: str) -> Optional[Dict]:
         """
         Get full session data by ID
         Returns None if not found
         """
+        entry = self.get_session_with_etag(session_id)
+        return entry[1] if entry else None
+    
+    def get_session_with_etag(self, session_id: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Get full session data by ID and its ETag
+        Served from an LRU cache; returns None if not found
+        """
+        with self._cache_lock:
+            cached = self._session_cache.get(session_id) if self._cache_reads else None
+            if cached is not None:
+                self._session_cache.move_to_end(session_id)
+                return cached
+            generation = self._cache_generation
+        
         db_session = self.SessionLocal()
         
         try:
@@ -109,11 +179,19 @@ class StorageManager:
                 Session.id == session_id
             ).first()
             
-            if session:
-                return session.to_dict(include_full=True)
-            return None
+            if not session:
+                return None
+            data = session.to_dict(include_full=True)
         finally:
             db_session.close()
+        
+        entry = (self._etag(data), data)
+        with self._cache_lock:
+            if self._cache_reads and generation == self._cache_generation:
+                self._session_cache[session_id] = entry
+                if len(self._session_cache) > SESSION_CACHE_SIZE:
+                    self._session_cache.popitem(last=False)
+        return entry
     
     def update_session(self, session_id: str, title: str = None, transcript: str = None, summary: Dict = None) -> bool:
         """
@@ -136,6 +214,7 @@ class StorageManager:
                     session.summary_json = json.dumps(summary)
                 
                 db_session.commit()
+                self._invalidate(session_id)
                 return True
             return False
         finally:
@@ -156,11 +235,13 @@ class StorageManager:
             if session:
                 db_session.delete(session)
                 db_session.commit()
+                self._invalidate(session_id)
                 return True
             return False
         finally:
             db_session.close()
 
 
-# Global storage instance
-storage = StorageManager()
+# Global storage instance. With several workers another process may have
+# written since the last read, so nothing is cached (ETags still work)
+storage = StorageManager(cache_reads=settings.WORKERS <= 1)
@@ -13,6 +13,23 @@ FILLER_WORDS = [
     r'\bliterally\b', r'\byeah\b', r'\bmhm\b', r'\bhmm\b'
 ]
 
+# All filler words in one pattern, so cleaning is a single pass over the text
+FILLER_PATTERN = re.compile('|'.join(FILLER_WORDS), flags=re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'[.!?]+')
+
+# Keywords marking decisions and action items
+DECISION_KEYWORDS = [
+    "decided", "agree", "agreed", "will", "going to", 
+    "should", "must", "determined", "concluded", "commit"
+]
+
+ACTION_KEYWORDS = [
+    "need to", "have to", "will", "should", "must",
+    "todo", "task", "action", "follow up", "next step",
+    "assign", "responsible", "deadline"
+]
+
 
 def summarize_transcript(transcript: str) -> Dict:
     """
@@ -53,16 +70,30 @@ def summarize_transcript(transcript: str) -> Dict:
     }
 
 
+def summarize_transcripts(transcripts: List[str]) -> List[Dict]:
+    """
+    Summarize several transcripts in one call
+    The regex patterns are compiled once at import and, like the keyword
+    lists, shared across the batch
+    
+    Args:
+        transcripts: Full text transcripts
+    
+    Returns:
+        One summary dictionary per transcript, in the same order
+    """
+    return [summarize_transcript(transcript) for transcript in transcripts]
+
+
 def clean_text(text: str) -> str:
     """
     Clean filler words and normalize text for better summarization
     """
     # Remove filler words
-    for filler in FILLER_WORDS:
-        text = re.sub(filler, '', text, flags=re.IGNORECASE)
+    text = FILLER_PATTERN.sub('', text)
     
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
     
     return text.strip()
 
@@ -72,7 +103,7 @@ def split_sentences(text: str) -> List[str]:
     Split text into sentences and clean them
     """
     # Split on sentence boundaries
-    sentences = re.split(r'[.!?]+', text)
+    sentences = SENTENCE_BOUNDARY_PATTERN.split(text)
     
     # Clean and filter
     cleaned = []
@@ -135,17 +166,12 @@ def extract_decisions(sentences: List[str]) -> List[str]:
     Extract sentences that look like decisions
     Keywords: decided, agreed, will, going to, should, must
     """
-    decision_keywords = [
-        "decided", "agree", "agreed", "will", "going to", 
-        "should", "must", "determined", "concluded", "commit"
-    ]
-    
     decisions = []
     seen = set()
     
     for sentence in sentences:
         lower = sentence.lower()
-        if any(keyword in lower for keyword in decision_keywords):
+        if any(keyword in lower for keyword in DECISION_KEYWORDS):
             formatted = format_bullet(sentence, max_words=18)
             # Avoid duplicates
             if formatted not in seen:
@@ -160,18 +186,12 @@ def extract_action_items(sentences: List[str]) -> List[str]:
     Extract sentences that look like action items
     Keywords: need to, have to, will, todo, task, action, follow up
     """
-    action_keywords = [
-        "need to", "have to", "will", "should", "must",
-        "todo", "task", "action", "follow up", "next step",
-        "assign", "responsible", "deadline"
-    ]
-    
     action_items = []
     seen = set()
     
     for sentence in sentences:
         lower = sentence.lower()
-        if any(keyword in lower for keyword in action_keywords):
+        if any(keyword in lower for keyword in ACTION_KEYWORDS):
             formatted = format_bullet(sentence, max_words=18)
             # Avoid duplicates
             if formatted not in seen:
@@ -20,21 +20,35 @@ except ImportError:
 
 import os
 import tempfile
+import threading
 
 # Initialize model globally (loaded once)
 # Import settings to use configured model size
 import settings
 MODEL_SIZE = settings.WHISPER_MODEL_SIZE
 MODEL = None
+_MODEL_LOCK = threading.Lock()
 
 
 def get_model():
-    """Lazy load the Whisper model"""
+    """
+    Lazy load the Whisper model, shared by every request
+    The lock stops concurrent first requests from each loading their own copy.
+    num_workers lets that many threads call transcribe() on it in parallel.
+    """
     global MODEL
     if not WHISPER_AVAILABLE:
         return None
     if MODEL is None:
-        MODEL = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
+        with _MODEL_LOCK:
+            if MODEL is None:
+                MODEL = WhisperModel(
+                    MODEL_SIZE,
+                    device=settings.WHISPER_DEVICE,
+                    compute_type=settings.WHISPER_COMPUTE_TYPE,
+                    cpu_threads=settings.WHISPER_CPU_THREADS,
+                    num_workers=settings.MAX_CONCURRENT_TRANSCRIBE
+                )
     return MODEL
 
 
@@ -107,7 +121,7 @@ def transcribe_audio(audio_path: str, preprocess: bool = True) -> str:
             processed_path = preprocess_audio(audio_path)
             temp_file_created = (processed_path != audio_path)
         
-        print(f"Loading Whisper model ({MODEL_SIZE})...")
+        print(f"Loading Whisper model ({MODEL_SIZE}, {settings.WHISPER_COMPUTE_TYPE})...")
         model = get_model()
         print("Model loaded. Starting transcription...")
         
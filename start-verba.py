@@ -6,10 +6,8 @@ Works on Windows, macOS, and Linux
 import os
 import sys
 import time
-import subprocess
-import webbrowser
-import signal
-from pathlib import Path
+
+IS_WIN = sys.platform == "win32"
 
 # Colors for terminal output
 class Colors:
@@ -23,132 +21,416 @@ def print_colored(message, color=Colors.GREEN):
     """Print colored message"""
     print(f"{color}{message}{Colors.END}")
 
-def is_port_in_use(port):
-    """Check if a port is already in use"""
+# Banners never change, so they are built once here
+_BLUE_BAR = f"{Colors.BLUE}{'=' * 40}{Colors.END}\n"
+_GREEN_BAR = f"{Colors.GREEN}{'=' * 40}{Colors.END}\n"
+
+_STARTING_HEADER = (
+    _BLUE_BAR
+    + f"{Colors.BLUE}     Starting Verba Application{Colors.END}\n"
+    + _BLUE_BAR
+    + "\n"
+)
+
+_RUNNING_HEADER = (
+    "\n"
+    + _GREEN_BAR
+    + f"{Colors.GREEN}   Verba is running! 🎉{Colors.END}\n"
+    + _GREEN_BAR
+    + "\n"
+    "Frontend: http://localhost:5173\n"
+    "Backend:  http://localhost:8000\n"
+    "\n"
+    "Logs:\n"
+    "  Backend:  verba-backend.log\n"
+    "  Frontend: verba-frontend.log\n"
+    "\n"
+    + f"{Colors.YELLOW}Press Ctrl+C to stop all servers{Colors.END}\n"
+    + "\n"
+)
+
+# Loopback literals instead of 'localhost' skip a name lookup per probe;
+# IPv6 too, since Vite may listen on ::1 only
+LOOPBACK_HOSTS = ('127.0.0.1', '::1')
+
+def _family(host):
+    """Socket address family for a loopback literal"""
+    import socket
+    return socket.AF_INET6 if ':' in host else socket.AF_INET
+
+# How long a "nothing listening" result is reused while waiting for a server
+PROBE_CACHE_TTL_MS = 100
+
+# port -> time.monotonic() of the last probe that found it closed
+_closed_ports = {}
+
+# Linux lets a socket whose connect() was refused try again, elsewhere
+# (BSD, macOS, Windows) it has to be replaced
+_REUSE_PROBE_SOCKETS = sys.platform.startswith("linux")
+
+# (host, port) -> socket whose last connect was refused, kept for the next probe.
+# Keyed by port too so concurrent waits on different ports never share one
+_probe_sockets = {}
+
+def _probe(host, port):
+    """Try to connect to host:port, returns the connect_ex error code (0 = listening)"""
+    import errno
+    import socket
+    
+    s = _probe_sockets.pop((host, port), None)
+    reused = s is not None
+    if not reused:
+        s = socket.socket(_family(host), socket.SOCK_STREAM)
+        s.settimeout(0.05)
+    
+    err = s.connect_ex((host, port))
+    if reused and err == errno.ECONNABORTED:
+        # Linux reports the previous refusal once more before really retrying
+        err = s.connect_ex((host, port))
+    
+    if err == errno.ECONNREFUSED and _REUSE_PROBE_SOCKETS:
+        _probe_sockets[(host, port)] = s
+    else:
+        s.close()
+    return err
+
+def _drop_probe_sockets(port):
+    """Close the kept probe sockets for port once it is known to be in use"""
+    for host in LOOPBACK_HOSTS:
+        s = _probe_sockets.pop((host, port), None)
+        if s is not None:
+            s.close()
+
+def is_port_in_use(port, ttl_ms=0):
+    """
+    Check if a port is already in use
+    With ttl_ms > 0, a closed result younger than ttl_ms is returned
+    without probing again; ttl_ms=0 always probes
+    """
+    if ttl_ms:
+        checked_at = _closed_ports.get(port)
+        if checked_at is not None and (time.monotonic() - checked_at) * 1000 < ttl_ms:
+            return False
+    
+    for host in LOOPBACK_HOSTS:
+        try:
+            if _probe(host, port) == 0:
+                _closed_ports.pop(port, None)
+                _drop_probe_sockets(port)
+                return True
+        except OSError:
+            # No IPv6 support on this machine
+            pass
+    
+    _closed_ports[port] = time.monotonic()
+    return False
+
+def ports_in_use(ports, timeout=0.1):
+    """
+    Check several ports at once, returns {port: in_use}
+    Starts every connect without blocking and collects the results together
+    """
+    import errno
+    import selectors
     import socket
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+    
+    in_progress = {errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK)}
+    result = {port: False for port in ports}
+    selector = selectors.DefaultSelector()
+    
+    try:
+        for port in ports:
+            for host in LOOPBACK_HOSTS:
+                try:
+                    s = socket.socket(_family(host), socket.SOCK_STREAM)
+                except OSError:
+                    # No IPv6 support on this machine
+                    continue
+                s.setblocking(False)
+                err = s.connect_ex((host, port))
+                if err in in_progress:
+                    selector.register(s, selectors.EVENT_WRITE, port)
+                    continue
+                if err == 0:
+                    result[port] = True
+                s.close()
+        
+        deadline = time.monotonic() + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                s = key.fileobj
+                if s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    result[key.data] = True
+                selector.unregister(s)
+                s.close()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+    
+    return result
+
+def wait_for_port(port, timeout=15.0, stop=None):
+    """
+    Wait until a server is listening on port, returns False on timeout
+    stop is an optional threading.Event that ends the wait early
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    try:
+        while not is_port_in_use(port, ttl_ms=PROBE_CACHE_TTL_MS):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # One uncached probe before giving up
+                return is_port_in_use(port, ttl_ms=0)
+            # Exponential backoff from 20 ms, capped at 200 ms
+            delay = min(0.02 * 2 ** attempt, 0.2, remaining)
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return False
+            attempt += 1
+        return True
+    finally:
+        # Timed out or stopped: the kept sockets won't be needed again
+        _drop_probe_sockets(port)
+
+def http_ready(port, path="/", timeout=3.0):
+    """
+    Wait until a server on port answers an HTTP request, returns False on timeout
+    Any status counts: a listening port alone doesn't mean Vite is serving yet
+    """
+    import http.client
+    
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        for host in LOOPBACK_HOSTS:
+            conn = http.client.HTTPConnection(host, port, timeout=0.2)
+            try:
+                conn.request("GET", path)
+                conn.getresponse()
+                return True
+            except (OSError, http.client.HTTPException):
+                # Refused, timed out or no IPv6 here
+                pass
+            finally:
+                conn.close()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(0.02 * 2 ** attempt, 0.2, remaining))
+        attempt += 1
+
+# O_CLOEXEC keeps the log out of any other child; Popen still hands it to the
+# server as stdout. Windows has no such flag
+_LOG_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+
+def _spawn(args, cwd, log_path):
+    """
+    Start a server in its own process group, writing stdout and stderr to log_path
+    The group lets stop_process() take down everything the server started
+    """
+    import subprocess
+    
+    # A raw fd instead of open(): the parent gets no file object to leak
+    log_fd = os.open(log_path, _LOG_FLAGS, 0o644)
+    try:
+        kwargs = {"cwd": cwd, "stdout": log_fd, "stderr": subprocess.STDOUT}
+        if IS_WIN:
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            # Same setsid() as preexec_fn=os.setsid, but keeps the posix_spawn/vfork fast path
+            kwargs["start_new_session"] = True
+        return subprocess.Popen(args, **kwargs)
+    finally:
+        # The child has its own copy now
+        os.close(log_fd)
+
+def spawn_backend(script_dir):
+    """Start the FastAPI backend, output goes to verba-backend.log"""
+    # Same interpreter as the launcher: no PATH lookup, same venv
+    return _spawn(
+        [sys.executable, "app.py"],
+        os.path.join(script_dir, "backend"),
+        os.path.join(script_dir, "verba-backend.log")
+    )
+
+def spawn_frontend(script_dir):
+    """Start the Vite dev server, output goes to verba-frontend.log"""
+    import shutil
+    
+    # Resolved up front so npm runs without a shell; on Windows npm is a .cmd shim
+    npm = shutil.which("npm.cmd") or shutil.which("npm") or "npm"
+    return _spawn(
+        [npm, "run", "dev"],
+        os.path.join(script_dir, "frontend"),
+        os.path.join(script_dir, "verba-frontend.log")
+    )
+
+def _group_alive(pgid):
+    """True while any process is left in the process group"""
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, just not ours to signal
+        pass
+    return True
+
+def stop_process(process, grace=2.0):
+    """
+    Stop a server and everything it started
+    Asks the process group to exit first and kills whatever is left of it
+    after grace seconds
+    """
+    import signal
+    import subprocess
+    
+    if IS_WIN:
+        process.send_signal(signal.CTRL_BREAK_EVENT)
+        try:
+            process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        return
+    
+    # start_new_session made the server its group leader, so pid == pgid;
+    # this still reaches Vite/esbuild after npm itself has exited
+    pgid = process.pid
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    
+    deadline = time.monotonic() + grace
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+    
+    # The leader exiting doesn't mean its children did
+    while _group_alive(pgid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    
+    if _group_alive(pgid):
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        # SIGKILL lands asynchronously; give the ports a moment to be released
+        deadline = time.monotonic() + 0.5
+        while _group_alive(pgid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+    process.wait()
+
+def open_browser(url):
+    """Open url in the default browser without waiting for it to start"""
+    if IS_WIN:
+        os.startfile(url)
+        return
+    import shutil
+    opener = "open" if sys.platform == "darwin" else shutil.which("xdg-open")
+    if opener:
+        import subprocess
+        subprocess.Popen(
+            [opener, url],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        return
+    # No desktop opener, let webbrowser look for a browser
+    import webbrowser
+    webbrowser.open(url)
 
 def main():
+    import signal
+    import threading
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
     # Get script directory
-    script_dir = Path(__file__).parent.absolute()
-    os.chdir(script_dir)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
     
-    print_colored("=" * 40, Colors.BLUE)
-    print_colored("     Starting Verba Application", Colors.BLUE)
-    print_colored("=" * 40, Colors.BLUE)
-    print()
+    # Banners go out in a single write so they don't flicker on slow terminals
+    sys.stdout.write(_STARTING_HEADER)
+    sys.stdout.flush()
     
     backend_process = None
     frontend_process = None
+    stop_waiting = threading.Event()
+    
+    # Probe both ports in one go before starting anything
+    in_use = ports_in_use((8000, 5173))
     
     try:
-        # Start backend
-        if is_port_in_use(8000):
+        # Start both servers before waiting on either, their boot times overlap
+        # port -> (name, log file)
+        waiting = {}
+        
+        if in_use[8000]:
             print_colored("⚠️  Port 8000 already in use. Backend may already be running.", Colors.YELLOW)
         else:
             print_colored("🚀 Starting backend server...", Colors.GREEN)
-            backend_dir = script_dir / "backend"
-            
-            if sys.platform == "win32":
-                backend_process = subprocess.Popen(
-                    ["python", "app.py"],
-                    cwd=backend_dir,
-                    stdout=open("verba-backend.log", "w"),
-                    stderr=subprocess.STDOUT,
-                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
-                )
-            else:
-                backend_process = subprocess.Popen(
-                    ["python3", "app.py"],
-                    cwd=backend_dir,
-                    stdout=open("verba-backend.log", "w"),
-                    stderr=subprocess.STDOUT,
-                    preexec_fn=os.setsid
-                )
-            
-            # Wait for backend
-            print("Waiting for backend to initialize...")
-            for _ in range(30):
-                if is_port_in_use(8000):
-                    print_colored("✅ Backend is ready!", Colors.GREEN)
-                    break
-                time.sleep(0.5)
+            backend_process = spawn_backend(script_dir)
+            waiting[8000] = ("Backend", "verba-backend.log")
         
-        # Start frontend
-        if is_port_in_use(5173):
+        if in_use[5173]:
             print_colored("⚠️  Port 5173 already in use. Frontend may already be running.", Colors.YELLOW)
         else:
             print_colored("🎨 Starting frontend server...", Colors.GREEN)
-            frontend_dir = script_dir / "frontend"
-            
-            if sys.platform == "win32":
-                frontend_process = subprocess.Popen(
-                    ["npm", "run", "dev"],
-                    cwd=frontend_dir,
-                    stdout=open("verba-frontend.log", "w"),
-                    stderr=subprocess.STDOUT,
-                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
-                    shell=True
-                )
-            else:
-                frontend_process = subprocess.Popen(
-                    ["npm", "run", "dev"],
-                    cwd=frontend_dir,
-                    stdout=open("verba-frontend.log", "w"),
-                    stderr=subprocess.STDOUT,
-                    preexec_fn=os.setsid
-                )
-            
-            # Wait for frontend
-            print("Waiting for frontend to initialize...")
-            for _ in range(30):
-                if is_port_in_use(5173):
-                    print_colored("✅ Frontend is ready!", Colors.GREEN)
-                    break
-                time.sleep(0.5)
+            frontend_process = spawn_frontend(script_dir)
+            waiting[5173] = ("Frontend", "verba-frontend.log")
+        
+        if waiting:
+            print("Waiting for servers to initialize...")
+            pool = ThreadPoolExecutor(max_workers=2)
+            try:
+                futures = {pool.submit(wait_for_port, port, stop=stop_waiting): port for port in waiting}
+                # Report in whatever order the servers come up
+                for future in as_completed(futures):
+                    name, log_file = waiting[futures[future]]
+                    if future.result():
+                        print_colored(f"✅ {name} is ready!", Colors.GREEN)
+                    else:
+                        print_colored(f"⚠️  {name} did not start in time. Check {log_file}", Colors.YELLOW)
+            finally:
+                # On Ctrl+C, make the waits still running return right away
+                stop_waiting.set()
+                pool.shutdown()
         
         # Open browser
         print()
         print_colored("🌐 Opening browser...", Colors.GREEN)
-        time.sleep(1)
-        webbrowser.open("http://localhost:5173")
+        # Give Vite until it actually serves a page instead of a fixed pause
+        http_ready(5173)
+        open_browser("http://localhost:5173")
         
-        print()
-        print_colored("=" * 40, Colors.GREEN)
-        print_colored("   Verba is running! 🎉", Colors.GREEN)
-        print_colored("=" * 40, Colors.GREEN)
-        print()
-        print("Frontend: http://localhost:5173")
-        print("Backend:  http://localhost:8000")
-        print()
-        print("Logs:")
-        print("  Backend:  verba-backend.log")
-        print("  Frontend: verba-frontend.log")
-        print()
-        print_colored("Press Ctrl+C to stop all servers", Colors.YELLOW)
-        print()
+        sys.stdout.write(_RUNNING_HEADER)
+        sys.stdout.flush()
         
-        # Keep running
+        # Idle until Ctrl+C without waking up every second
         while True:
-            time.sleep(1)
+            if IS_WIN:
+                # No signal.pause() on Windows; a long sleep is still cut short by Ctrl+C
+                time.sleep(3600)
+            else:
+                signal.pause()
             
     except KeyboardInterrupt:
         print()
         print_colored("🛑 Stopping Verba...", Colors.YELLOW)
         
-        # Kill processes
-        if backend_process:
-            if sys.platform == "win32":
-                backend_process.send_signal(signal.CTRL_BREAK_EVENT)
-            else:
-                os.killpg(os.getpgid(backend_process.pid), signal.SIGTERM)
-        
-        if frontend_process:
-            if sys.platform == "win32":
-                frontend_process.send_signal(signal.CTRL_BREAK_EVENT)
-            else:
-                os.killpg(os.getpgid(frontend_process.pid), signal.SIGTERM)
+        # Stop both servers at once so their grace periods overlap
+        running = [p for p in (backend_process, frontend_process) if p]
+        if running:
+            with ThreadPoolExecutor(max_workers=len(running)) as pool:
+                list(pool.map(stop_process, running))
         
         print_colored("✅ Verba stopped", Colors.GREEN)
         sys.exit(0)